@@ -1,78 +1,469 @@
 from mcp.server.fastmcp import FastMCP
+from mcp.shared.exceptions import McpError
 import mcp.types as types
-from pathlib import Path
-from typing import Dict, Any, List
-
-mcp = FastMCP("Test GPT App", host="0.0.0.0", port=8000)
-
-# 예시를 위해 간단한 HTML 생성
-HTML_TO_RENDER_TOOL_RESULT = """
-<div>
-    <h1>Test Tool Result</h1>
-    <p>test tool 호출 결과를 표시하기 위한 UI 템플릿</p>
-    <p>이 템플릿에 tool 호출 결과가 전달됨</p>
-</div>
-"""
-# 1. UI 역할을 하는 Resource 등록
-# - uri값이 이 리소스를 식별하는 ID값으로 사용됨. -> 유니크한 값으로 설정 필요 
-# - mimeType을 'text/html+skybridge'으로 설정해야함. 그리고 text 필드에 렌더링될 html을 명시.
-@mcp._mcp_server.list_resources()
-async def _list_resources() -> List[types.Resource]:
-    return [
-        types.Resource(
-            name="test widget", 
-            title="test widget", 
-            uri="ui://widget/test-widget.html",
-            description="test widget",
-            text=HTML_TO_RENDER_TOOL_RESULT,
-            mimeType='text/html+skybridge',
+import bisect
+import logging
+import os
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Annotated, Any, Dict
+import msgspec
+
+# 운영 기본값은 WARNING (요청마다 찍히는 로그 I/O가 부하에서 꽤 먹음).
+# 로컬 디버깅 시 LOG_LEVEL=DEBUG 로 올려서 쓰면 됨.
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "WARNING"))
+logger = logging.getLogger(__name__)
+
+mcp = FastMCP("Solar System App", host="0.0.0.0", port=8000)
+_server = mcp._mcp_server
+
+# 핫패스에서 매번 types.X 속성 체인을 타지 않도록 모듈 레벨 alias로 끌어올림
+_TextContent = types.TextContent
+_CallToolResult = types.CallToolResult
+_ReadResourceResult = types.ReadResourceResult
+_ServerResult = types.ServerResult
+
+MIME_TYPE = "text/html+skybridge"
+# pathlib 객체 생성 오버헤드 없이 평범한 문자열 경로로 다룸
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+# 행성 이름/별칭 key는 전부 intern해서 dict 조회가 포인터 비교 fast path를 타게 함
+PLANETS = tuple(
+    sys.intern(planet)
+    for planet in (
+        "Mercury",
+        "Venus",
+        "Earth",
+        "Mars",
+        "Jupiter",
+        "Saturn",
+        "Uranus",
+        "Neptune",
+    )
+)
+DEFAULT_PLANET = "Earth"
+
+# 자주 들어오는 별칭/오타 -> 정식 행성 이름 (key는 소문자 + 영숫자만 남긴 형태)
+# MappingProxyType으로 감싸서 런타임에 실수로 수정되는 걸 막음 (상수 선언의 의미)
+PLANET_ALIASES = MappingProxyType({
+    sys.intern(alias): sys.intern(planet)
+    for alias, planet in {
+        "terra": "Earth",
+        "gaia": "Earth",
+        "theearth": "Earth",
+        "redplanet": "Mars",
+        "morningstar": "Venus",
+        "eveningstar": "Venus",
+        "gasgiant": "Jupiter",
+        "ringedplanet": "Saturn",
+    }.items()
+})
+
+PLANET_DESCRIPTIONS = MappingProxyType({
+    sys.intern(planet): description
+    for planet, description in {
+        "Mercury": "태양에서 가장 가까운 행성. 낮과 밤의 온도차가 매우 큼.",
+        "Venus": "두꺼운 이산화탄소 대기로 덮여 있는 태양계에서 가장 뜨거운 행성.",
+        "Earth": "현재까지 생명체가 확인된 유일한 행성.",
+        "Mars": "산화철 때문에 붉게 보이는 행성. 올림푸스 화산이 있음.",
+        "Jupiter": "태양계에서 가장 큰 가스형 행성. 대적점이 유명함.",
+        "Saturn": "뚜렷한 고리를 가진 가스형 행성.",
+        "Uranus": "자전축이 거의 누워서 도는 얼음형 행성.",
+        "Neptune": "태양계 가장 바깥쪽의 행성. 강한 폭풍이 붊.",
+    }.items()
+})
+
+
+# UI 위젯 하나에 대한 메타데이터 묶음
+@dataclass(frozen=True, slots=True)
+class SolarWidget:
+    identifier: str
+    title: str
+    template_uri: str
+    invoking: str
+    invoked: str
+    html: str
+    response_text: str
+
+
+def _preload_widget_html() -> Dict[str, str]:
+    # assets 디렉토리를 시작 시 os.scandir 한 번으로 스캔해서 위젯 HTML을 전부
+    # 메모리에 올림. 이후 조회는 디스크를 전혀 건드리지 않는 dict 조회임.
+    cache: Dict[str, str] = {}
+    try:
+        entries = os.scandir(ASSETS_DIR)
+    except FileNotFoundError:
+        return cache
+    with entries:
+        for entry in entries:
+            if not entry.name.endswith(".html") or not entry.is_file():
+                continue
+            with open(entry.path, "rb") as f:
+                cache[entry.name[: -len(".html")]] = f.read().decode("utf8")
+    return cache
+
+
+_HTML_CACHE = _preload_widget_html()
+
+
+@lru_cache(maxsize=None)
+def _load_widget_html(component_name: str) -> str:
+    cached = _HTML_CACHE.get(component_name)
+    if cached is not None:
+        return cached
+    # 해시가 붙은 빌드 결과물(solar-system-<hash>.html)은 이름 기준 최대값을 고름
+    candidate = max(
+        (stem for stem in _HTML_CACHE if stem.startswith(component_name)), default=None
+    )
+    if candidate is not None:
+        return _HTML_CACHE[candidate]
+    raise FileNotFoundError(f"{component_name}.html 을 {ASSETS_DIR} 에서 찾을 수 없음")
+
+
+SOLAR_WIDGET = SolarWidget(
+    identifier="solar-system",
+    title="Solar System",
+    template_uri="ui://widget/solar-system.html",
+    invoking="행성 찾는 중...",
+    invoked="행성을 중심에 맞췄음",
+    html=_load_widget_html("solar-system"),
+    response_text="태양계 위젯을 표시했음",
+)
+
+
+# tool 호출 입력값. ChatGPT 쪽에서는 camelCase 키로 넘어옴.
+# msgspec.Struct라서 검증이 C 레벨에서 돌고, pydantic model_validate보다 훨씬 빠름.
+class SolarInput(
+    msgspec.Struct,
+    rename={"planet_name": "planetName", "auto_orbit": "autoOrbit"},
+    forbid_unknown_fields=True,
+):
+    planet_name: Annotated[
+        str, msgspec.Meta(description="중심에 맞출 행성 이름 (별칭/접두어도 허용)")
+    ] = DEFAULT_PLANET
+    auto_orbit: Annotated[
+        bool, msgspec.Meta(description="자동 공전 애니메이션 여부")
+    ] = True
+
+
+# 필드 두 개짜리 스키마라 생성기를 돌리지 않고 직접 씀 (import 시간 절약).
+# SolarInput 필드를 바꾸면 여기도 같이 맞춰줘야 함.
+TOOL_INPUT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "planetName": {
+            "description": "중심에 맞출 행성 이름 (별칭/접두어도 허용)",
+            "type": "string",
+            "default": DEFAULT_PLANET,
+        },
+        "autoOrbit": {
+            "description": "자동 공전 애니메이션 여부",
+            "type": "boolean",
+            "default": True,
+        },
+    },
+    "required": [],
+    "additionalProperties": False,
+}
+
+
+# 영숫자가 아닌 ASCII 코드포인트를 지우는 translate 테이블.
+# str.translate는 C에서 돌아서 문자 단위 generator보다 훨씬 빠름.
+# (비ASCII 문자는 테이블에 없어서 그대로 남지만, 어차피 테이블 key와 매칭 안 됨)
+_DELETE_NONALNUM = {cp: None for cp in range(128) if not chr(cp).isalnum()}
+
+
+def _planet_key(name: str) -> str:
+    return name.lower().translate(_DELETE_NONALNUM)
+
+
+# 행성 하나의 응답 재료(정식 이름 + 설명 + structuredContent 고정 부분)를
+# 한 레코드로 묶어서, 해시 조회 한 번이면 tool 호출에 필요한 게 다 나오게 함
+@dataclass(frozen=True, slots=True)
+class PlanetRecord:
+    name: str
+    description: str
+    structured_base: Dict[str, Any]
+
+
+_PLANET_RECORDS: Dict[str, PlanetRecord] = {
+    planet: PlanetRecord(
+        name=planet,
+        description=PLANET_DESCRIPTIONS.get(planet, ""),
+        structured_base={
+            sys.intern("planet_name"): planet,
+            sys.intern("planet_description"): PLANET_DESCRIPTIONS.get(planet, ""),
+        },
+    )
+    for planet in PLANETS
+}
+_DEFAULT_RECORD = _PLANET_RECORDS[DEFAULT_PLANET]
+
+# 정규화된 key -> 행성 레코드 테이블을 import 시점에 한 번만 구축.
+# 요청마다 PLANETS를 돌면서 key를 다시 만들지 않도록 함.
+_NORMALIZED: Dict[str, PlanetRecord] = {
+    _planet_key(planet): record for planet, record in _PLANET_RECORDS.items()
+}
+_NORMALIZED.update(
+    {alias: _PLANET_RECORDS[planet] for alias, planet in PLANET_ALIASES.items()}
+)
+# 소문자 정식 이름 -> 레코드. 대부분의 입력("earth", "Mars")이 여기서 바로 끝남.
+_PLANET_LOWER = {planet.lower(): record for planet, record in _PLANET_RECORDS.items()}
+# 접두어 매칭 fallback용 (정렬해 두면 결과가 결정적임. key가 유니크해서
+# bisect/sort가 레코드끼리 비교할 일은 없음)
+_PREFIX_KEYS = tuple(sorted(_NORMALIZED.items(), key=lambda item: item[0]))
+
+
+@lru_cache(maxsize=256)
+def _normalize_planet(name: str | None) -> PlanetRecord | None:
+    """입력 문자열을 행성 레코드로 정규화. 매칭 실패 시 None.
+
+    입력 공간이 행성 8개 + 별칭/오타 몇 개로 사실상 고정이라 memoize함.
+    (순수 함수 + 불변 반환값이라 캐싱 안전)
+    """
+    if not name:
+        return _DEFAULT_RECORD
+    key = name.strip().lower()
+    if not key:
+        return _DEFAULT_RECORD
+    record = _PLANET_LOWER.get(key)
+    if record is not None:
+        return record
+    clean = key.translate(_DELETE_NONALNUM)
+    if not clean:
+        return None
+    record = _NORMALIZED.get(clean)
+    if record is not None:
+        return record
+    # "jup", "nep" 같은 접두어 입력 허용. 정렬된 튜플이라 bisect로 바로 점프하면
+    # clean으로 시작하는 key 중 사전순 첫 번째가 idx 위치에 옴 (선형 스캔 불필요)
+    idx = bisect.bisect_left(_PREFIX_KEYS, (clean,))
+    if idx < len(_PREFIX_KEYS):
+        k, record = _PREFIX_KEYS[idx]
+        if k.startswith(clean):
+            return record
+    return None
+
+
+def _tool_meta(widget: SolarWidget) -> Dict[str, Any]:
+    return {
+        "openai/outputTemplate": widget.template_uri,
+        "openai/toolInvocation/invoking": widget.invoking,
+        "openai/toolInvocation/invoked": widget.invoked,
+        "openai/widgetAccessible": True,
+        "openai/resultCanProduceWidget": True,
+        "annotations": {
+            "destructiveHint": False,
+            "openWorldHint": False,
+            "readOnlyHint": True,
+        },
+    }
+
+
+def _resource_description(widget: SolarWidget) -> str:
+    return f"{widget.title} 위젯을 렌더링하는 HTML 템플릿"
+
+
+def _widget_resource_contents(widget: SolarWidget) -> types.TextResourceContents:
+    return types.TextResourceContents(
+        uri=widget.template_uri,
+        mimeType=MIME_TYPE,
+        text=widget.html,
+        title=widget.title,
+    )
+
+
+# SOLAR_WIDGET은 frozen이라 아래 값들은 전부 불변 -> import 시점에 한 번만 만들어두고
+# list_* 핸들러는 매번 재구축하지 않고 그대로 반환함 (ChatGPT가 list_*를 자주 폴링함)
+_SOLAR_TOOL_META = _tool_meta(SOLAR_WIDGET)
+_SOLAR_DESC = _resource_description(SOLAR_WIDGET)
+
+# 위젯 HTML이 들어가는 contents 객체는 embedded resource와 read_resource 응답이
+# 하나를 공유함 (HTML이 커져도 객체는 한 벌만 유지).
+# 요청마다 model_dump하면 O(html 길이) 직렬화가 매번 돌기 때문에
+# dump 결과까지 import 시점에 고정해둠
+_SHARED_WIDGET_CONTENT = _widget_resource_contents(SOLAR_WIDGET)
+_EMBEDDED_WIDGET = types.EmbeddedResource(
+    type="resource", resource=_SHARED_WIDGET_CONTENT
+)
+_EMBEDDED_WIDGET_JSON = _EMBEDDED_WIDGET.model_dump(mode="json")
+
+# tool 호출 응답 _meta는 통째로 요청과 무관한 고정값이라 merge 없이 그대로 재사용
+_CALL_META = {
+    "openai/outputTemplate": SOLAR_WIDGET.template_uri,
+    "openai/toolInvocation/invoking": SOLAR_WIDGET.invoking,
+    "openai/toolInvocation/invoked": SOLAR_WIDGET.invoked,
+    "openai/widgetAccessible": True,
+    "openai/resultCanProduceWidget": True,
+    "openai.com/widget": _EMBEDDED_WIDGET_JSON,
+}
+
+# 요청마다 structuredContent를 처음부터 만들지 않고 레코드의 고정 부분에
+# autoOrbit만 얹어서 반환함. key는 intern해서 직렬화 쪽 해시를 빠르게 함.
+_AUTO_ORBIT_KEY = sys.intern("autoOrbit")
+
+# 행성별 성공 메시지는 고정이라 TextContent도 행성당 하나만 만들어서 재사용
+_TEXT_BY_PLANET = {
+    planet: types.TextContent(type="text", text=f"{planet} 중심으로 보이게 했음~~~~")
+    for planet in PLANETS
+}
+
+# 에러 메시지에 들어가는 행성 목록 join도 매번 돌리지 않게 상수로
+_PLANETS_JOINED = ", ".join(PLANETS)
+
+
+def _invalid_planet_error(name: str) -> types.ServerResult:
+    return _ServerResult.model_construct(
+        _CallToolResult.model_construct(
+            content=[
+                _TextContent.model_construct(
+                    type="text",
+                    text=f"'{name}' 은(는) 모르는 행성임. 가능한 값: {_PLANETS_JOINED}",
+                )
+            ],
+            isError=True,
         )
-    ]
-
-# 2. Tool 등록
-# Tool과 UI역할을 하는 리소스를 연결하기 위해서 _meta필드의 openai/outputTemplate 필드에 UI 역할을 하는 리소스의 uri를 명시해야함.
-# 여기서 위에서 등록한 test widget의 uri 값을 전달
-@mcp._mcp_server.list_tools()
-async def _list_tools() -> List[types.Tool]:
-    return [
+    )
+
+# list_* 핸들러 3개가 돌려주는 고정 목록을 카탈로그 하나로 묶음.
+# 핸들러는 순회만 하니까 list 대신 불변이고 더 작은 tuple을 씀.
+@dataclass(frozen=True, slots=True)
+class ServerCatalog:
+    tools: tuple[types.Tool, ...]
+    resources: tuple[types.Resource, ...]
+    templates: tuple[types.ResourceTemplate, ...]
+
+
+_CATALOG = ServerCatalog(
+    tools=(
         types.Tool(
-            name="test-tool",
-            title="test tool",
-            description="test tool",
-            inputSchema={},
-            _meta={"openai/outputTemplate": "ui://widget/test-widget.html"},
-        )
-    ]
+            name="focus-solar-planet",
+            title="Focus Solar Planet",
+            description="태양계 위젯에서 지정한 행성을 중심에 맞춰서 보여줌",
+            inputSchema=TOOL_INPUT_SCHEMA,
+            _meta=_SOLAR_TOOL_META,
+        ),
+    ),
+    resources=(
+        types.Resource(
+            name=SOLAR_WIDGET.identifier,
+            title=SOLAR_WIDGET.title,
+            uri=SOLAR_WIDGET.template_uri,
+            description=_SOLAR_DESC,
+            mimeType=MIME_TYPE,
+            _meta=_SOLAR_TOOL_META,
+        ),
+    ),
+    templates=(
+        types.ResourceTemplate(
+            uriTemplate=SOLAR_WIDGET.template_uri,
+            name=SOLAR_WIDGET.identifier,
+            title=SOLAR_WIDGET.title,
+            description=_SOLAR_DESC,
+            mimeType=MIME_TYPE,
+            _meta=_SOLAR_TOOL_META,
+        ),
+    ),
+)
+
+
+# 1. Tool 등록
+# Tool과 UI역할을 하는 리소스를 연결하기 위해서 _meta필드의 openai/outputTemplate 필드에
+# UI 역할을 하는 리소스의 uri를 명시해야함.
+@_server.list_tools()
+async def _list_tools() -> tuple[types.Tool, ...]:
+    return _CATALOG.tools
+
 
-# 3. 앱 등록 시 list_tool() 호출의 결과에 따라 tool 별로 연결된 resource를 read하는 요청(ReadResourcesList)를 처리하는 함수 구현
+# 2. UI 역할을 하는 Resource 등록
+# - uri값이 이 리소스를 식별하는 ID값으로 사용됨. -> 유니크한 값으로 설정 필요
+# - mimeType을 'text/html+skybridge'으로 설정해야함.
+@_server.list_resources()
+async def _list_resources() -> tuple[types.Resource, ...]:
+    return _CATALOG.resources
+
+
+@_server.list_resource_templates()
+async def _list_resource_templates() -> tuple[types.ResourceTemplate, ...]:
+    return _CATALOG.templates
+
+
+# read_resource 응답도 embedded resource와 같은 contents 객체를 공유함
+_WIDGET_CONTENTS = [_SHARED_WIDGET_CONTENT]
+
+
+# resource uri -> 미리 만들어둔 read_resource 응답. if/elif 체인 대신 dict 디스패치라
+# 위젯이 늘어나도 O(1)이고, 응답 객체도 요청마다 새로 만들지 않음.
+_RESOURCE_RESULTS = {
+    SOLAR_WIDGET.template_uri: _ServerResult.model_construct(
+        _ReadResourceResult.model_construct(contents=_WIDGET_CONTENTS)
+    )
+}
+# 모르는 uri는 빈 성공 응답이 아니라 JSON-RPC 에러로 돌려줘야 함.
+# 에러 객체도 고정이라 하나만 만들어둠 (lowlevel 서버가 McpError를 error 응답으로 변환함)
+_UNKNOWN_RESOURCE_ERROR = McpError(
+    types.ErrorData(code=types.INVALID_PARAMS, message="등록되지 않은 resource uri임")
+)
+
+
+# 3. tool 별로 연결된 resource를 read하는 요청(ReadResourceRequest)을 처리하는 함수
+# 응답 객체들은 우리가 직접 만드는 값이라 필드가 항상 유효함 ->
+# model_construct로 pydantic 검증을 건너뜀 (검증은 import 시점 상수 생성 때만)
 async def _handle_read_resource(req: types.ReadResourceRequest) -> types.ServerResult:
-    # 예제코드는 tool이 하나라서 바로 연결된 resource를 반환(실제 구현 시 요청받은 resource_uri 값이 따라 다른 resource를 반환하도록 구현되어야 함)
-    return types.ServerResult(types.ReadResourceResult(contents=[
-        types.TextResourceContents(
-            uri="ui://widget/test-widget.html",
-            mimeType='text/html+skybridge',
-            text=HTML_TO_RENDER_TOOL_RESULT,
-        )
-    ]))
+    logger.debug("handle_read_resource 호출됨: %s", req.params.uri)
+    result = _RESOURCE_RESULTS.get(str(req.params.uri))
+    if result is None:
+        raise _UNKNOWN_RESOURCE_ERROR
+    return result
 
-# 4. 도구 호출을 처리하는 함수 구현
+
+# 4. 도구 호출을 처리하는 함수
 # - structuredContent 필드값이 UI 렌더링에 사용됨
 async def _call_tool_request(req: types.CallToolRequest) -> types.ServerResult:
-    return types.ServerResult(types.CallToolResult(
-        content = [
-            types.TextContent(
-                type="text",
-                text="test tool 호출 결과",
+    logger.debug("_call_tool_request 호출됨: %s", req.params.name)
+    arguments = req.params.arguments or {}
+    try:
+        payload = msgspec.convert(arguments, SolarInput)
+    except msgspec.ValidationError as exc:
+        return _ServerResult.model_construct(
+            _CallToolResult.model_construct(
+                content=[
+                    _TextContent.model_construct(
+                        type="text", text=f"잘못된 입력값: {exc}"
+                    )
+                ],
+                isError=True,
             )
-        ],
-        structuredContent={},
-    ))
+        )
+
+    record = _normalize_planet(payload.planet_name)
+    if record is None:
+        return _invalid_planet_error(payload.planet_name)
+
+    structured = {**record.structured_base, _AUTO_ORBIT_KEY: payload.auto_orbit}
+    return _ServerResult.model_construct(
+        _CallToolResult.model_construct(
+            content=[_TEXT_BY_PLANET[record.name]],
+            structuredContent=structured,
+            meta=_CALL_META,
+        )
+    )
 
-mcp._mcp_server.request_handlers[types.ReadResourceRequest] = _handle_read_resource
-mcp._mcp_server.request_handlers[types.CallToolRequest] = _call_tool_request
+
+_server.request_handlers[types.ReadResourceRequest] = _handle_read_resource
+_server.request_handlers[types.CallToolRequest] = _call_tool_request
 
 # 서버 실행
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http")
-
+    # uvloop이 있으면 C로 구현된 이벤트 루프로 교체 (작은 MCP 메시지 위주 워크로드에서
+    # 콜백 오버헤드가 줄어서 처리량이 눈에 띄게 올라감). 없으면 기본 루프 사용.
+    try:
+        import asyncio
+        import uvloop
 
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    mcp.run(transport="streamable-http")